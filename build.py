@@ -1,5 +1,12 @@
 # /// script
-# dependencies = ["pillow", "jinja2", "httpx"]
+# dependencies = [
+#     "pillow-simd; platform_machine == 'x86_64'",
+#     "pillow; platform_machine != 'x86_64'",
+#     "jinja2",
+#     "httpx[http2]",
+#     "ijson",
+#     "orjson",
+# ]
 # ///
 """
 Flashbulb: Build a static photo archive from a Flickr data export.
@@ -11,17 +18,27 @@ Expects zip files from Flickr export in the current directory.
 Outputs a static site to ./public_html/
 """
 
+import asyncio
 import html
-import json
 import glob
 import os
 import re
 import shutil
+import subprocess
 import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import chain, repeat
 from pathlib import Path
 from datetime import datetime
-
-from PIL import Image
+from functools import lru_cache
+from io import BytesIO
+from operator import itemgetter
+
+import httpx
+import ijson
+import orjson
+import PIL
+from PIL import Image, features
 from jinja2 import Environment
 from markupsafe import Markup
 
@@ -37,28 +54,91 @@ THUMB_SIZE = 320    # square crop (2x for 160px grid cells)
 
 IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif"}
 VIDEO_EXTENSIONS = {".3gp", ".avi", ".mp4", ".mov"}
+POSTER_CONCURRENCY = 16  # simultaneous poster downloads from Flickr's CDN
+WRITE_THREADS = 32       # threads for writing generated HTML pages
+
+# Flickr ID in a media filename: anything_{digits}_o.ext or anything_{digits}.ext
+_ID_RE = re.compile(r"_(\d+)(?:_o)?\.\w+$")
 
 # ---------------------------------------------------------------------------
 # Step 1: Extract zips
 # ---------------------------------------------------------------------------
 
+def _member_dir(work_dir: Path, name: str) -> Path:
+    """Directory that zipfile will extract member `name` into.
+
+    Drops "", "." and ".." components the same way ZipFile.extract does,
+    so the result always stays inside work_dir.
+    """
+    parts = [p for p in name.split("/") if p not in ("", ".", "..")]
+    if not name.endswith("/"):
+        parts = parts[:-1]
+    return work_dir.joinpath(*parts)
+
+
+def _extract_members(zf: str, names: list[str], work_dir: Path):
+    """Extract the named members of one zip (runs in a worker process)."""
+    with zipfile.ZipFile(zf) as z:
+        for name in names:
+            z.extract(name, work_dir)
+
+
 def extract_zips(work_dir: Path):
-    """Extract all zips into work_dir, skipping if already done."""
+    """Extract all zips into work_dir in parallel, skipping if already done.
+
+    Each zip goes to its own worker; when there are fewer zips than cores,
+    each zip's members are also dealt across workers (every Deflate stream
+    in a zip is independent, so they inflate in parallel). All member
+    directories are created serially beforehand.
+    """
     if work_dir.exists() and any(work_dir.iterdir()):
         print(f"  {work_dir} already exists, skipping extraction")
         return
 
     work_dir.mkdir(parents=True, exist_ok=True)
-    for zf in sorted(glob.glob("*.zip")):
-        print(f"  Extracting {zf}...")
+    zips = sorted(glob.glob("*.zip"))
+    if not zips:
+        return
+
+    n_cpu = os.cpu_count() or 1
+    slices_per_zip = max(1, n_cpu // len(zips))
+    jobs: list[tuple[str, list[str]]] = []
+    member_dirs: set[Path] = set()
+    for zf in zips:
+        print(f"  Reading {zf}...")
         with zipfile.ZipFile(zf) as z:
-            z.extractall(work_dir)
+            names = z.namelist()
+        member_dirs.update(_member_dir(work_dir, name) for name in names)
+        jobs.extend(
+            (zf, names[k::slices_per_zip])
+            for k in range(min(slices_per_zip, len(names)))
+        )
+
+    if not jobs:
+        return
+
+    # zipfile's exists-then-makedirs isn't atomic, so create every directory
+    # up front; workers (even ones extracting different zips) then never race
+    for d in member_dirs:
+        os.makedirs(d, exist_ok=True)
+
+    n_members = sum(len(names) for _, names in jobs)
+    n_workers = min(len(jobs), n_cpu)
+    print(f"  Extracting {n_members} members from {len(zips)} zips on {n_workers} workers...")
+    with ProcessPoolExecutor(max_workers=n_workers) as ex:
+        list(ex.map(_extract_members, *zip(*jobs), repeat(work_dir)))
 
 
 # ---------------------------------------------------------------------------
 # Step 2: Parse metadata
 # ---------------------------------------------------------------------------
 
+@lru_cache(maxsize=None)
+def _unescape_markup(s: str) -> Markup:
+    """Unescape Flickr HTML entities once per distinct string ("nice pic!" repeats a lot)."""
+    return Markup(html.unescape(s))
+
+
 def load_photos(work_dir: Path) -> list[dict]:
     """Load all photo_*.json files, merge aggregate comments, return sorted list."""
 
@@ -66,24 +146,22 @@ def load_photos(work_dir: Path) -> list[dict]:
     nsid_names: dict[str, str] = {}
     nsid_file = work_dir / "nsid_names.json"
     if nsid_file.exists():
-        with open(nsid_file) as f:
-            nsid_names = json.load(f)
+        nsid_names = orjson.loads(nsid_file.read_bytes())
         print(f"  Loaded {len(nsid_names)} NSID name mappings")
 
     # Load aggregate comments file and index by photo_id
     agg_comments: dict[str, list[dict]] = {}
     agg_file = work_dir / "photos_comments_part001.json"
     if agg_file.exists():
-        with open(agg_file) as f:
-            agg_data = json.load(f)
-        for c in agg_data.get("comments", []):
-            agg_comments.setdefault(c["photo_id"], []).append(c)
+        # Stream one comment at a time rather than loading the whole file
+        with open(agg_file, "rb") as f:
+            for c in ijson.items(f, "comments.item", use_float=True):
+                agg_comments.setdefault(c["photo_id"], []).append(c)
         print(f"  Loaded {sum(len(v) for v in agg_comments.values())} aggregate comments")
 
     photos = []
     for jf in sorted(work_dir.glob("photo_*.json")):
-        with open(jf) as f:
-            data = json.load(f)
+        data = orjson.loads(jf.read_bytes())
 
         # Note: including all photos regardless of privacy setting
 
@@ -108,19 +186,24 @@ def load_photos(work_dir: Path) -> list[dict]:
         # safe Markup so Jinja2 autoescape passes the HTML through as-is.
         desc = data.get("description", "")
         if desc:
-            data["description"] = Markup(html.unescape(desc))
+            data["description"] = _unescape_markup(desc)
 
         # Comments from Flickr also contain HTML entities; resolve NSIDs to names
         for c in data.get("comments", []):
             if c.get("comment"):
-                c["comment"] = Markup(html.unescape(c["comment"]))
-            if c.get("user") and c["user"] in nsid_names:
-                c["user"] = nsid_names[c["user"]]
+                c["comment"] = _unescape_markup(c["comment"])
+            user = c.get("user")
+            if user:
+                c["user"] = nsid_names.get(user, user)
 
         photos.append(data)
 
-    # Sort by date_taken descending (newest first)
-    photos.sort(key=lambda p: p.get("date_taken", ""), reverse=True)
+    # Sort by date_taken descending (newest first); fill in missing dates so
+    # the C-level itemgetter can serve as the sort key
+    for p in photos:
+        if "date_taken" not in p:
+            p["date_taken"] = ""
+    photos.sort(key=itemgetter("date_taken"), reverse=True)
     print(f"  Loaded {len(photos)} photos")
     return photos
 
@@ -135,15 +218,25 @@ def build_file_index(work_dir: Path) -> dict[str, Path]:
     Filenames look like: {slug}_{id}_o.{ext} or {slug}_{id}.{ext} (videos)
     """
     index = {}
-    for f in work_dir.iterdir():
-        if f.suffix.lower() == ".json":
-            continue
-        # Try to extract the flickr ID from the filename
-        # Pattern: anything_{digits}_o.ext or anything_{digits}.ext
-        m = re.search(r"_(\d+)(?:_o)?\.(\w+)$", f.name)
-        if m:
-            photo_id = m.group(1)
-            index[photo_id] = f
+    # scandir yields names and file types from the directory listing itself,
+    # without building a Path or calling stat() per entry
+    with os.scandir(work_dir) as it:
+        for entry in it:
+            name = entry.name
+            if name.lower().endswith(".json") or not entry.is_file():
+                continue
+            # Fast path: split "{slug}_{id}[_o].{ext}" with string ops
+            stem, dot, ext = name.rpartition(".")
+            if stem.endswith("_o"):
+                stem = stem[:-2]
+            _, sep, tail = stem.rpartition("_")
+            if dot and sep and ext.isalnum() and tail.isdecimal():
+                index[tail] = Path(entry.path)
+                continue
+            # Rare fallback for anything the split doesn't handle
+            m = _ID_RE.search(name)
+            if m:
+                index[m.group(1)] = Path(entry.path)
     print(f"  Indexed {len(index)} media files")
     return index
 
@@ -152,9 +245,13 @@ def build_file_index(work_dir: Path) -> dict[str, Path]:
 # Step 4: Generate resized images
 # ---------------------------------------------------------------------------
 
-def make_thumbnail(src: Path, dst: Path):
+def make_thumbnail(src: Path | BytesIO, dst: Path):
     """Create a square center-crop thumbnail."""
     with Image.open(src) as img:
+        # Let libjpeg decode at 1/2, 1/4 or 1/8 scale; the short side stays
+        # >= 2x THUMB_SIZE so the Lanczos resize below still has headroom.
+        if img.format == "JPEG":
+            img.draft("RGB", (THUMB_SIZE * 2, THUMB_SIZE * 2))
         img = img.convert("RGB")
 
         # Apply rotation if needed
@@ -166,16 +263,112 @@ def make_thumbnail(src: Path, dst: Path):
         left = (w - side) // 2
         top = (h - side) // 2
         img = img.crop((left, top, left + side, top + side))
-        img = img.resize((THUMB_SIZE, THUMB_SIZE), Image.LANCZOS)
+        # reducing_gap: box-reduce by an integer factor first (cheap), leaving
+        # only a short Lanczos pass to reach THUMB_SIZE
+        img = img.resize((THUMB_SIZE, THUMB_SIZE), Image.LANCZOS, reducing_gap=3.0)
         img.save(dst, "JPEG", quality=80)
 
 
+def make_video_thumbnail(src: Path, dst: Path):
+    """Create a thumbnail from a frame of a local video file using ffmpeg."""
+    # Seek before -i for a fast keyframe seek; clips shorter than a second
+    # produce no frame at t=1, so fall back to the first frame.
+    for seek in ("1", "0"):
+        proc = subprocess.run(
+            # -nostdin + DEVNULL: ffmpeg must not grab the terminal (it would
+            # switch it to raw mode, and stall on SIGTTIN when backgrounded)
+            ["ffmpeg", "-nostdin", "-ss", seek, "-i", str(src), "-frames:v", "1",
+             # shrink so the short side is at most 2x THUMB_SIZE; like draft()
+             # for JPEGs, never upscale (small 3gp clips stay at native size)
+             "-vf", f"scale=w='if(gt(iw,ih),-2,min(iw,{THUMB_SIZE * 2}))'"
+                    f":h='if(gt(iw,ih),min(ih,{THUMB_SIZE * 2}),-2)'",
+             "-f", "image2pipe", "-vcodec", "mjpeg", "-q:v", "2",
+             "-loglevel", "error", "-"],
+            stdin=subprocess.DEVNULL, capture_output=True, timeout=30,
+        )
+        if proc.returncode:
+            raise RuntimeError(f"ffmpeg: {proc.stderr.decode(errors='replace').strip()}")
+        if proc.stdout:
+            make_thumbnail(BytesIO(proc.stdout), dst)
+            return
+    raise RuntimeError("ffmpeg produced no frame")
+
+
+def _link_or_copy(src: Path, dst: Path):
+    """Hardlink src to dst, falling back to a full copy (e.g. across filesystems)."""
+    try:
+        os.link(src, dst)
+    except FileExistsError:
+        pass
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _thumb_worker(task: tuple[Path, Path]) -> str | None:
+    """Make one thumbnail in a worker process; return an error message on failure."""
+    src, dst = task
+    try:
+        if src.suffix.lower() in VIDEO_EXTENSIONS:
+            make_video_thumbnail(src, dst)
+        else:
+            make_thumbnail(src, dst)
+    except Exception as e:
+        return str(e)
+    return None
+
+
+async def _fetch_poster(client: httpx.AsyncClient, sem: asyncio.Semaphore, url: str, dst: Path):
+    """Download one poster frame to dst."""
+    async with sem:
+        resp = await client.get(url)
+        resp.raise_for_status()
+        dst.write_bytes(resp.content)
+
+
+async def _download_posters(jobs: list[tuple[str, str, Path]]) -> list[BaseException | None]:
+    """Download (pid, url, dst) poster jobs over one shared client.
+
+    Returns one entry per job: None on success, the exception on failure.
+    """
+    sem = asyncio.Semaphore(POSTER_CONCURRENCY)
+    limits = httpx.Limits(max_connections=POSTER_CONCURRENCY)
+    async with httpx.AsyncClient(
+        http2=True, follow_redirects=True, timeout=30, limits=limits,
+    ) as client:
+        return await asyncio.gather(
+            *[_fetch_poster(client, sem, url, dst) for _, url, dst in jobs],
+            return_exceptions=True,
+        )
+
+
 def process_media(photos: list[dict], file_index: dict[str, Path]):
-    """Generate thumbnails for each photo and copy originals."""
+    """Generate thumbnails for each photo and link/copy originals.
+
+    Runs in two phases: a fast serial pass that records file metadata, links
+    originals, and queues thumbnail jobs; then a process pool that does the
+    CPU-bound decode + resize work across all cores. Video thumbnails come
+    from a frame grabbed with ffmpeg; without ffmpeg, Flickr's poster frames
+    download concurrently in the main process instead.
+    """
     photos_dir = SITE_DIR / "photos"
     total = len(photos)
 
+    # (src, dst) pairs for the thumbnail pool, plus a label for error messages
+    thumb_tasks: list[tuple[Path, Path]] = []
+    thumb_labels: list[str] = []
+    # Videos without ffmpeg: (pid, url, poster_dst) downloads, then
+    # (pid, poster_dst, thumb_dst) thumbnails once the posters are on disk
+    poster_jobs: list[tuple[str, str, Path]] = []
+    video_thumbs: list[tuple[str, Path, Path]] = []
+    n_built = 0
+    have_ffmpeg = shutil.which("ffmpeg") is not None
+
     for i, photo in enumerate(photos):
+        # Report progress up front so the missing-file and fast-path
+        # `continue`s below don't skip it
+        if i and i % 100 == 0:
+            print(f"  [{i}/{total}] processed")
+
         pid = photo["id"]
         src = file_index.get(pid)
         if not src:
@@ -190,42 +383,76 @@ def process_media(photos: list[dict], file_index: dict[str, Path]):
         photo["_is_image"] = photo["_ext"] in IMAGE_EXTENSIONS
 
         out_dir = photos_dir / pid
-        out_dir.mkdir(parents=True, exist_ok=True)
-
-        # Copy original
         original_dst = out_dir / f"original{photo['_ext']}"
-        if not original_dst.exists():
-            shutil.copy2(src, original_dst)
+        thumb_dst = out_dir / "thumb.jpg"
         photo["_original_filename"] = original_dst.name
 
-        # Generate thumbnail
-        thumb_dst = out_dir / "thumb.jpg"
+        # Fast path for rebuilds: nothing left to copy or thumbnail
+        if thumb_dst.exists() and original_dst.exists():
+            n_built += 1
+            continue
+
+        out_dir.mkdir(parents=True, exist_ok=True)
 
+        # Link (or copy) original
+        if not original_dst.exists():
+            _link_or_copy(src, original_dst)
+
+        # Queue thumbnail
         if photo["_is_image"]:
             if not thumb_dst.exists():
-                try:
-                    make_thumbnail(src, thumb_dst)
-                except Exception as e:
-                    print(f"  [{i+1}/{total}] Thumb failed for {pid}: {e}")
+                thumb_tasks.append((src, thumb_dst))
+                thumb_labels.append(f"Thumb failed for {pid}")
 
         elif photo["_is_video"] and not thumb_dst.exists():
-            # Download Flickr's poster frame and make a thumbnail from it
-            poster_url = photo.get("original", "")
-            if poster_url:
-                try:
-                    import httpx
+            if have_ffmpeg:
+                # Grab a frame from the local video file
+                thumb_tasks.append((src, thumb_dst))
+                thumb_labels.append(f"Video thumb failed for {pid}")
+            else:
+                # No ffmpeg: download Flickr's poster frame and make a thumbnail from it
+                poster_url = photo.get("original", "")
+                if poster_url:
                     poster_dst = out_dir / "poster.jpg"
                     if not poster_dst.exists():
-                        print(f"  [{i+1}/{total}] Downloading poster for video {pid}...")
-                        resp = httpx.get(poster_url, follow_redirects=True, timeout=30)
-                        resp.raise_for_status()
-                        poster_dst.write_bytes(resp.content)
-                    make_thumbnail(poster_dst, thumb_dst)
-                except Exception as e:
-                    print(f"  [{i+1}/{total}] Video poster failed for {pid}: {e}")
+                        poster_jobs.append((pid, poster_url, poster_dst))
+                    video_thumbs.append((pid, poster_dst, thumb_dst))
+
+    if total:
+        print(f"  [{total}/{total}] processed")
+    if n_built:
+        print(f"  {n_built} photos already built, skipped")
+
+    if not thumb_tasks and not video_thumbs:
+        return
 
-        if (i + 1) % 100 == 0 or i + 1 == total:
-            print(f"  [{i+1}/{total}] processed")
+    # Generate thumbnails in parallel (decode + Lanczos resize is CPU-bound).
+    # Executor.map submits eagerly, so the image thumbnails are already being
+    # crunched while the poster downloads run.
+    print(f"  Generating thumbnails on {os.cpu_count()} cores...")
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+        results = ex.map(_thumb_worker, thumb_tasks, chunksize=8)
+
+        if poster_jobs:
+            print(f"  Downloading {len(poster_jobs)} video posters...")
+            errors = asyncio.run(_download_posters(poster_jobs))
+            for (pid, _, _), err in zip(poster_jobs, errors):
+                if err:
+                    print(f"  Video poster failed for {pid}: {err}")
+
+        poster_tasks = []
+        for pid, poster_dst, thumb_dst in video_thumbs:
+            if poster_dst.exists():
+                poster_tasks.append((poster_dst, thumb_dst))
+                thumb_labels.append(f"Video poster failed for {pid}")
+        results = chain(results, ex.map(_thumb_worker, poster_tasks, chunksize=8))
+
+        n_thumbs = len(thumb_labels)
+        for j, (label, err) in enumerate(zip(thumb_labels, results)):
+            if err:
+                print(f"  [{j+1}/{n_thumbs}] {label}: {err}")
+            if (j + 1) % 100 == 0 or j + 1 == n_thumbs:
+                print(f"  [{j+1}/{n_thumbs}] thumbnails")
 
 
 # ---------------------------------------------------------------------------
@@ -384,19 +611,18 @@ SEARCH_JS = """\
   var yearSections = document.querySelectorAll('.year-section');
   var toc = document.querySelector('.toc');
 
-  // Build index from data attributes already in the DOM
-  var items = Array.from(document.querySelectorAll('.year-section .grid a')).map(function(a) {
+  // Search index emitted by build.py: {id, t(itle), d(esc), g (tags csv), y (date), v (video)}
+  var items = JSON.parse(document.getElementById('search-data').textContent).map(function(p) {
     return {
-      el: a,
-      haystack: (
-        (a.title || '') + ' ' +
-        (a.dataset.desc || '') + ' ' +
-        (a.dataset.tags || '').replace(/,/g, ' ') + ' ' +
-        (a.dataset.date || '')
-      ).toLowerCase()
+      p: p,
+      haystack: (p.t + ' ' + p.d + ' ' + p.g.replace(/,/g, ' ') + ' ' + p.y).toLowerCase()
     };
   });
 
+  function esc(s) {
+    return s.replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;').replace(/"/g, '&quot;');
+  }
+
   input.addEventListener('input', function() {
     var q = input.value.trim().toLowerCase();
     if (!q) {
@@ -419,7 +645,10 @@ SEARCH_JS = """\
     var html = '<div class="result-count">' + matches.length + ' results for &ldquo;' +
       q.replace(/</g,'&lt;') + '&rdquo;</div><div class="grid">';
     matches.forEach(function(item) {
-      html += item.el.outerHTML;
+      var p = item.p;
+      html += '<a href="photos/' + p.id + '/" title="' + esc(p.t) + '"' +
+        (p.v ? ' class="video-badge"' : '') +
+        '><img src="photos/' + p.id + '/thumb.jpg" alt="" loading="lazy"></a>';
     });
     html += '</div>';
     results.innerHTML = html;
@@ -447,7 +676,7 @@ INDEX_TEMPLATE = Template("""\
 <div class="year-section" id="y{{ year }}">
 <h2 class="year-header">{{ year }} <span>{{ photos|length }} photos</span></h2>
 <div class="grid">
-{% for photo in photos %}<a href="photos/{{ photo.id }}/" title="{{ photo.name }}" data-tags="{{ photo.tags|map(attribute='tag')|join(',') }}" data-desc="{{ photo.description|default('',true)|striptags|truncate(200,true,'') }}" data-date="{{ photo.date_taken }}"{% if photo._is_video %} class="video-badge"{% endif %}><img src="photos/{{ photo.id }}/thumb.jpg" alt="" loading="lazy"></a>
+{% for photo in photos %}<a href="photos/{{ photo.id }}/" title="{{ photo.name }}"{% if photo._is_video %} class="video-badge"{% endif %}><img src="photos/{{ photo.id }}/thumb.jpg" alt="" loading="lazy"></a>
 {% endfor %}
 </div>
 </div>
@@ -457,6 +686,7 @@ INDEX_TEMPLATE = Template("""\
   {{ comment_count }} comments on {{ commented_count }} photos.
   {{ geo_count }} geotagged.
 </div>
+<script id="search-data" type="application/json">{{ search_data }}</script>
 <script src="assets/search.js"></script>
 </body>
 </html>
@@ -585,12 +815,30 @@ TAG_PAGE_TEMPLATE = Template("""\
 """)
 
 
+def _render_photo(pid: str, photo: dict, prev_id: str | None, next_id: str | None) -> tuple[str, str]:
+    """Render one photo page (runs in a worker process); return (pid, html)."""
+    return pid, PHOTO_TEMPLATE.render(
+        photo=photo,
+        prev_id=prev_id,
+        next_id=next_id,
+    )
+
+
+def _write_pages(pages: list[tuple[Path, str]]):
+    """Write (path, html) pairs, overlapping the small writes in a thread pool."""
+    # Create directories serially first so the writer threads never race on mkdir
+    for d in {path.parent for path, _ in pages}:
+        d.mkdir(parents=True, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=WRITE_THREADS) as ex:
+        list(ex.map(lambda pc: pc[0].write_text(pc[1]), pages))
+
+
 def generate_html(photos: list[dict]):
     """Generate index.html, per-photo pages, tag pages, and shared assets."""
     from collections import OrderedDict
 
     # Filter to photos with files
-    visible = [p for p in photos if p.get("_has_file")]
+    visible = tuple(p for p in photos if p.get("_has_file"))
 
     # Write shared CSS
     assets_dir = SITE_DIR / "assets"
@@ -599,78 +847,110 @@ def generate_html(photos: list[dict]):
     (assets_dir / "search.js").write_text(SEARCH_JS)
     print(f"  Wrote assets/style.css, assets/search.js")
 
-    # Gather stats
-    years = [p["date_taken"][:4] for p in visible if p.get("date_taken")]
-    year_min = min(years) if years else "?"
-    year_max = max(years) if years else "?"
-
-    # Build tag -> photos mapping
-    tag_photos: dict[str, list[dict]] = {}
-    for p in visible:
-        for t in p.get("tags", []):
-            tag_photos.setdefault(t["tag"], []).append(p)
-
-    # Group photos by year (newest first)
+    # One pass over visible: group by year (newest first), build the
+    # tag -> photos mapping, gather stats, and build the search index
     by_year = OrderedDict()
+    tag_photos: dict[str, list[dict]] = {}
+    year_min = year_max = None
+    tagged_count = comment_count = commented_count = geo_count = 0
+    search_index: list[dict] = []
     for p in visible:
-        yr = p.get("date_taken", "")[:4] or "unknown"
-        by_year.setdefault(yr, []).append(p)
-
-    # Write index
+        yr = p.get("date_taken", "")[:4]
+        by_year.setdefault(yr or "unknown", []).append(p)
+        if yr:
+            if year_min is None or yr < year_min:
+                year_min = yr
+            if year_max is None or yr > year_max:
+                year_max = yr
+
+        tags = p.get("tags")
+        if tags:
+            tagged_count += 1
+            for t in tags:
+                tag_photos.setdefault(t["tag"], []).append(p)
+        desc = Markup(p.get("description") or "").striptags()
+        entry = {
+            "id": p["id"],
+            "t": p.get("name", ""),
+            # Same cut as truncate(200, true, '') incl. Jinja's default 5-char leeway
+            "d": desc if len(desc) <= 205 else desc[:200],
+            "g": ",".join(t["tag"] for t in tags or ()),
+            "y": p.get("date_taken", "")[:10],
+        }
+        if p.get("_is_video"):
+            entry["v"] = 1
+        search_index.append(entry)
+
+        comments = p.get("comments")
+        if comments:
+            commented_count += 1
+            comment_count += len(comments)
+
+        if p.get("geo"):
+            geo_count += 1
+
+    # Write index. The search index is inlined as JSON; escaping "<" keeps
+    # any "</script>" in a title or description from closing the tag.
+    search_data = Markup(orjson.dumps(search_index).decode().replace("<", "\\u003c"))
     index_html = INDEX_TEMPLATE.render(
+        search_data=search_data,
         years=list(by_year.items()),
         photo_count=len(visible),
-        year_min=year_min,
-        year_max=year_max,
+        year_min=year_min or "?",
+        year_max=year_max or "?",
         tag_count=len(tag_photos),
-        tagged_count=sum(1 for p in visible if p.get("tags")),
-        comment_count=sum(len(p.get("comments", [])) for p in visible),
-        commented_count=sum(1 for p in visible if p.get("comments")),
-        geo_count=sum(1 for p in visible if p.get("geo")),
+        tagged_count=tagged_count,
+        comment_count=comment_count,
+        commented_count=commented_count,
+        geo_count=geo_count,
     )
     (SITE_DIR / "index.html").write_text(index_html)
     print(f"  Wrote index.html ({len(visible)} photos)")
 
-    # Write per-photo pages
-    for i, photo in enumerate(visible):
-        prev_id = visible[i - 1]["id"] if i > 0 else None
-        next_id = visible[i + 1]["id"] if i < len(visible) - 1 else None
-
-        photo_html = PHOTO_TEMPLATE.render(
-            photo=photo,
-            prev_id=prev_id,
-            next_id=next_id,
+    # Write per-photo pages (rendered across processes; Jinja is GIL-bound)
+    photos_dir = SITE_DIR / "photos"
+    # pid -> (prev_id, next_id), so each job is self-contained for a worker
+    neighbors: dict[str, tuple[str | None, str | None]] = {}
+    last = len(visible) - 1
+    for i, p in enumerate(visible):
+        neighbors[p["id"]] = (
+            visible[i - 1]["id"] if i > 0 else None,
+            visible[i + 1]["id"] if i < last else None,
         )
-        out_dir = SITE_DIR / "photos" / photo["id"]
-        out_dir.mkdir(parents=True, exist_ok=True)
-        (out_dir / "index.html").write_text(photo_html)
-
+    jobs = [(p["id"], p, *neighbors[p["id"]]) for p in visible]
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+        photo_pages = [
+            (photos_dir / pid / "index.html", photo_html)
+            for pid, photo_html in ex.map(_render_photo, *zip(*jobs), chunksize=32)
+        ]
+
+    _write_pages(photo_pages)
     print(f"  Wrote {len(visible)} photo pages")
 
     # Write tag index
     tags_dir = SITE_DIR / "tags"
     tags_dir.mkdir(parents=True, exist_ok=True)
-    sorted_tags = sorted(tag_photos.items(), key=lambda x: -len(x[1]))
+    sorted_tags = sorted(tag_photos.items(), key=lambda kv: len(kv[1]), reverse=True)
     tag_index_html = TAG_INDEX_TEMPLATE.render(
         tags=[(t, len(ps)) for t, ps in sorted_tags],
-        photo_count=sum(1 for p in visible if p.get("tags")),
+        photo_count=tagged_count,
     )
     (tags_dir / "index.html").write_text(tag_index_html)
     print(f"  Wrote tags/index.html ({len(sorted_tags)} tags)")
 
     # Write per-tag pages
+    tag_pages: list[tuple[Path, str]] = []
     for tag, photos_for_tag in sorted_tags:
-        tag_dir = tags_dir / tag
-        tag_dir.mkdir(parents=True, exist_ok=True)
         tag_html = TAG_PAGE_TEMPLATE.render(
             tag=tag,
             photos=photos_for_tag,
         )
-        (tag_dir / "index.html").write_text(tag_html)
+        tag_pages.append((tags_dir / tag / "index.html", tag_html))
 
+    _write_pages(tag_pages)
     print(f"  Wrote {len(sorted_tags)} tag pages")
 
-    # (search data is now embedded as data attributes in index.html grid links)
+    # (search data is embedded as a JSON blob in index.html)
 
 
 # ---------------------------------------------------------------------------
@@ -681,6 +961,9 @@ def main():
     work_dir = Path("_extracted")
     SITE_DIR.mkdir(parents=True, exist_ok=True)
 
+    # Pillow-SIMD reports a ".postN" version; libjpeg-turbo speeds up JPEG decode
+    print(f"Pillow {PIL.__version__} (libjpeg-turbo: {features.check('libjpeg_turbo')})")
+
     print("Step 1: Extracting zips...")
     extract_zips(work_dir)
 